@@ -1,139 +1,1297 @@
 import streamlit as st
-import pandas as pd
-import base64
+import atexit
+import binascii
 import os
-from openai import OpenAI
 import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import json
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import csv
+import io
+import hashlib
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+# Request timings and prompt-cache usage are logged at INFO; set LOG_LEVEL=INFO to see them.
+# Records still propagate to any handler the host configures; only when there is none does
+# this module write to stderr itself. Guarded so a re-import doesn't attach a second handler
+_log_level = (os.getenv("LOG_LEVEL") or "WARNING").upper()
+logger.setLevel(_log_level if isinstance(logging.getLevelName(_log_level), int) else logging.WARNING)
+if not logger.handlers and not logging.getLogger().handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_log_handler)
+if logger.level == logging.WARNING and _log_level != "WARNING":
+    logger.warning("Unknown LOG_LEVEL %r, using WARNING", _log_level)
+
+# Connection pool of each OpenAI client: total connections, keep-alive connections, and how
+# long (seconds) an idle connection is kept warm
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_KEEPALIVE_EXPIRY = 60
+# Times the transport retries a failed connection attempt, below the SDK's request retries
+HTTP_CONNECT_RETRIES = 2
+
+# Timeouts (seconds) and retry budgets for OpenAI calls, so a stalled request is cut off
+# and retried instead of tying up the Streamlit worker
+OPENAI_CONNECT_TIMEOUT = 10
+OPENAI_TIMEOUT = 60
+OPENAI_MAX_RETRIES = 2
+TRANSCRIPTION_TIMEOUT = 60  # One image; grouped requests add the per-image allowance below
+TRANSCRIPTION_TIMEOUT_PER_EXTRA_IMAGE = 30  # The JSON reply for a group isn't streamed, so it grows with each recipe
+TRANSCRIPTION_MAX_RETRIES = 3
+TRANSCRIPTION_GROUP_MAX_RETRIES = 1  # A group that keeps failing falls back to single-image requests
+WEBSITE_TIMEOUT = 180  # o1-mini can reason for minutes before the first streamed token
+
+# openai (and the httpx stack under it) is imported on first use rather than at module level;
+# it roughly doubles the cold-start import time and the landing page never needs it. The same
+# goes for diskcache, Pillow, jinja2 and markdown, which are only needed once images are submitted
+
+def _http_limits():
+    """
+    Build the connection pool limits shared by the sync and async OpenAI clients.
+
+    Returns:
+        httpx.Limits: The pool limits.
+    """
+    import httpx
+
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+@st.cache_resource
+def get_openai_client():
+    """
+    Return the OpenAI client shared across reruns and sessions, so its pooled
+    HTTP/2 connections stay warm instead of being rebuilt on every rerun.
+
+    Returns:
+        OpenAI: The shared OpenAI client.
+    """
+    import httpx
+    from openai import OpenAI
+
+    http_client = httpx.Client(transport=httpx.HTTPTransport(http2=True, limits=_http_limits(), retries=HTTP_CONNECT_RETRIES))
+    # Close the pooled connections cleanly when the server shuts down
+    atexit.register(http_client.close)
+    return OpenAI(
+        api_key=st.secrets["OPENAI_API_KEY"],
+        timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        max_retries=OPENAI_MAX_RETRIES,
+        http_client=http_client,
+    )
+
+def _async_openai_client():
+    """
+    Create an async OpenAI client for one transcription run.
+
+    httpx async connections are bound to the event loop that opened them, and
+    asyncio.run() starts a fresh loop per run, so this client is not cached.
+
+    Returns:
+        AsyncOpenAI: A new async OpenAI client.
+    """
+    import httpx
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(
+        api_key=st.secrets["OPENAI_API_KEY"],
+        timeout=httpx.Timeout(TRANSCRIPTION_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        max_retries=TRANSCRIPTION_MAX_RETRIES,
+        http_client=httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(http2=True, limits=_http_limits(), retries=HTTP_CONNECT_RETRIES)
+        ),
+    )
+
+# Maximum number of transcription requests one run keeps in flight at once. They are I/O-bound,
+# so this is set by the account's rate limits, not by the host's core count
+MAX_CONCURRENT_TRANSCRIPTIONS = int(os.getenv("MAX_CONCURRENT_TRANSCRIPTIONS", "8"))
+# Maximum number of transcription requests in flight across all sessions of this process,
+# so simultaneous submits queue instead of tripping the account's rate limits
+LLM_INFLIGHT_LIMIT = int(os.getenv("LLM_INFLIGHT_LIMIT", "16"))
+# Seconds between attempts to take a free request slot
+LLM_SLOT_POLL_INTERVAL = 0.05
+# Transcription requests per minute the process may start, matching the account's RPM limit;
+# requests beyond it wait locally instead of being rejected with 429 and backing off
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+
+# Routes every transcription request to the same prompt-cache shard; the instructions prefix is
+# identical across users, so sharing one key maximizes cache hits
+TRANSCRIPTION_CACHE_KEY = "recipe-transcription"
+
+# Lifetime (seconds) of images uploaded to the Files API. OpenAI deletes them afterwards, so
+# they don't pile up against the storage quota; within it, retries and reruns reuse the upload.
+UPLOADED_IMAGE_TTL = 24 * 3600
+UPLOADED_IMAGE_REUSE_MARGIN = 600
+
+# Maximum number of images sent together in one multi-image transcription request; lower it if
+# long recipes make grouped replies run into max_output_tokens
+TRANSCRIPTION_GROUP_SIZE = int(os.getenv("TRANSCRIPTION_GROUP_SIZE", "8"))
+
+# Matches the ```html fenced block the website model wraps its code in
+HTML_FENCE_RE = re.compile(r"```html\s*(.*?)\s*```", re.DOTALL | re.IGNORECASE)
+DOCTYPE_RE = re.compile(r"<!DOCTYPE html>", re.IGNORECASE)
+# Characters that start raw HTML or an entity in markdown; '>' is left alone so blockquotes still work
+MARKDOWN_UNSAFE_RE = re.compile(r"[&<]")
+MARKDOWN_ESCAPES = {"&": "&amp;", "<": "&lt;"}
+
+# Instructions shared by every transcription request. Sent as a fixed prefix ahead of the
+# images, and long enough (over 1024 tokens) for OpenAI's prompt cache to apply to it.
+TRANSCRIPTION_INSTRUCTIONS = """
+You transcribe photographs of handwritten recipes into clean, faithful markdown. Transcribe the following handwritten recipe into markdown format without any commentary.
+
+## Goal
+
+Produce a digital copy of the recipe card that a home cook could follow without seeing the original. Preserve the author's wording, quantities, and order. Do not invent ingredients, steps, temperatures, or times that are not written on the card, and do not "improve" the recipe.
+
+## Output structure
+
+Use this structure, omitting any section the card does not contain:
+
+1. A level-one heading (`# `) with the recipe title exactly as written. If the card has no title, write a short descriptive title based on the dish (for example `# Chocolate Chip Cookies`).
+2. An optional short line in italics for any attribution or note written near the title (for example `*From Grandma Rose*`).
+3. A `## Ingredients` section with one bulleted item per ingredient.
+4. A `## Instructions` section with numbered steps, one action or closely related group of actions per step.
+5. A `## Notes` section for anything else written on the card: serving suggestions, oven variations, storage advice, margin notes, or remarks on the back of the card.
+
+If the card lists ingredient groups (for example "For the crust" and "For the filling"), use level-three headings (`### For the crust`) inside the Ingredients section and keep each group's items under its heading. Do the same for grouped instructions.
+
+## Ingredients
+
+- Write quantities first, then the unit, then the ingredient: `- 2 cups all-purpose flour`.
+- Keep the units the author used. Do not convert between metric and imperial.
+- Never expand an abbreviation or abbreviate a spelled-out word: `c` stays `c`, and `cups` stays `cups`. The only normalization is between variant abbreviations of the same unit, and only when unambiguous: `tsp` for `t` or `tsp.`, `tbsp` for `T`, `Tbs` or `tbsp.`, `c` for `C` or `c.`, and the trailing period dropped from `oz.`, `lb.`, `g.` and `ml.`.
+- Write fractions as plain text (`1/2`, `1 1/2`), not Unicode fraction characters.
+- Keep preparation notes attached to the ingredient: `- 1 onion, finely chopped`.
+- If an ingredient has no quantity, write it as written: `- salt and pepper to taste`.
+
+## Instructions
+
+- Number every step, starting from 1.
+- Keep oven temperatures, times, and pan sizes exactly as written, including the scale (°F or °C) when given.
+- Split a long run-on paragraph into separate steps where the author clearly moves to a new action, but do not reorder steps.
+- If the card only lists ingredients and has no method, omit the Instructions section rather than inventing one.
+
+## Handwriting and legibility
+
+- When a word is hard to read, choose the reading that makes sense for a recipe (for example "bake" rather than "bike").
+- When a word or quantity is genuinely illegible, write `[illegible]` in its place. Never guess a quantity.
+- Keep crossed-out text out of the transcription unless it was clearly replaced by nothing; in that case add it to Notes as `~~text~~`.
+- Include corrections written above or beside the original text in place of the text they correct.
+- Ignore stains, doodles, printed card borders, and decorative elements.
+
+## Numbers and quantities
+
+- Handwritten digits are easy to confuse. Check 1 against 7, 4 against 9, 5 against 6, and 0 against 6 using the context: a teaspoon of salt is far more likely than seven, and cookies bake at 350 rather than 850.
+- Treat a slash between two small numbers as a fraction (`1/2 cup`), and a dash between two numbers as a range (`20-25 minutes`).
+- Keep "scant", "heaping", "generous", and similar qualifiers next to the quantity they modify.
+- If the card gives a yield or serving count ("makes 2 dozen", "serves 6"), put it on its own line directly under the title in italics.
+
+## Formatting rules
+
+- Use standard CommonMark markdown only: headings, bullet lists, numbered lists, emphasis, and strikethrough.
+- Do not use tables, HTML tags, code blocks, emoji, or horizontal rules.
+- Do not wrap the transcription in a code fence.
+- Leave one blank line between sections.
+- Do not add introductions, explanations, apologies, or closing remarks. Output only the transcription.
+
+## Multiple images
+
+A request may contain several images, each preceded by its image name. Each image is a separate recipe; never merge recipes across images, and never let text from one image appear in another image's transcription. When asked for JSON, return exactly one entry per image, in the order the images were given, whose markdown follows every rule above.
+
+## Example
+
+For a card reading "Gma's Banana Bread — 3 ripe bananas mashed, 1/3 c melted butter, 3/4 c sugar, 1 egg, 1 tsp vanilla, 1 tsp baking soda, pinch salt, 1 1/2 c flour. Heat oven 350. Mix butter into bananas, add sugar egg & vanilla. Sprinkle soda & salt over, mix in flour. Bake in loaf pan 1 hr. Freezes well!", the transcription is below. Only the layout changes; every word, abbreviation, and quantity stays as the author wrote it.
+
+# Gma's Banana Bread
+
+## Ingredients
+
+- 3 ripe bananas mashed
+- 1/3 c melted butter
+- 3/4 c sugar
+- 1 egg
+- 1 tsp vanilla
+- 1 tsp baking soda
+- pinch salt
+- 1 1/2 c flour
+
+## Instructions
+
+1. Heat oven 350.
+2. Mix butter into bananas, add sugar egg & vanilla.
+3. Sprinkle soda & salt over, mix in flour.
+4. Bake in loaf pan 1 hr.
+
+## Notes
+
+- Freezes well!
+"""
+
+# Instructions for the website model. Kept free of per-request data so every request starts
+# with the same prefix; the website name and recipes are appended after it.
+WEBSITE_PROMPT = """Create a complete, responsive single-page HTML website with the name given at the end of this prompt. The website should display the recipes listed at the end of this prompt in a user-friendly format with proper navigation.
+
+For each recipe, create a comprehensive blog post that includes:
+
+- **An engaging introduction**: Hook the reader with a personal anecdote, the history of the recipe, or why it's special.
+- **A detailed ingredient list**: Clearly list all ingredients with measurements.
+- **Step-by-step instructions**: Provide clear and concise cooking steps, using numbered lists.
+- **Helpful tips and variations**: Offer cooking tips, substitution suggestions, and variations.
+- **Nutritional information**: Include approximate nutritional values if possible.
+- **A captivating conclusion**: Summarize the recipe experience or encourage readers to try it out.
+
+Ensure that the blog posts are written in a friendly, conversational tone, aiming for about 800-1000 words each. Use high-quality, descriptive language to make the recipes come alive.
+
+Include embedded CSS styles that support both light and dark modes based on the user's system preferences, ensuring high contrast between text and background for readability. Use appropriate HTML tags to format headings, paragraphs, lists, and other elements to ensure the recipes are well-presented and easy to read.
+
+**Requirements:**
+
+- **Navigation Bar**: A navigation bar with the website name and links to each recipe section.
+- **Main Section**: A main section listing all recipes with links that navigate to each recipe within the same page using anchor tags.
+- **Responsive Design**: Ensure the website is responsive for mobile and desktop devices.
+- **Dark Mode Support**: Use CSS media queries to support light and dark modes, ensuring high contrast for readability.
+- **Embedded CSS and JavaScript**: Include all CSS and JavaScript within the HTML file (no external files).
+- **Smooth Scrolling**: Implement smooth scrolling when navigating to different sections.
+- **Iframe Compatibility**: Ensure that anchor links function correctly within an iframe without redirecting the main page.
+- **Consistent Formatting**: Use clear and consistent formatting for all recipes and blog posts.
+- **No Explanations**: Do not include any explanations or additional text; only provide the complete HTML code.
+- **Valid HTML**: Ensure the HTML code is valid and well-formatted.
+"""
+
+# Runs of spaces and tabs, collapsed to one space before recipes are sent to the website model
+HORIZONTAL_WHITESPACE_RE = re.compile(r"[ \t]+")
+# Runs of blank lines (and the spaces around them), collapsed to one paragraph break
+BLANK_LINES_RE = re.compile(r"\s*\n\s*\n\s*")
+
+# Longest edge, in pixels, uploads are downscaled to; the vision model reads handwriting no
+# better above this, but bills and transfers by pixel area
+MAX_IMAGE_EDGE = 1024
+
+# JPEG quality used when re-encoding downscaled uploads
+IMAGE_JPEG_QUALITY = 80
+
+# Uploads larger than this are rejected before decoding; no recipe photo needs more, and
+# Pillow would spend seconds and hundreds of MB decoding one
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+# Threads used to read and downscale uploads. Pillow releases the GIL while decoding and
+# resizing, so this is CPU-bound work and more threads than cores only adds memory
+IMAGE_PREP_WORKERS = min(8, os.cpu_count() or 1)
+
+# Page template for the locally rendered website. Recipe content is pre-rendered HTML;
+# everything else is autoescaped.
+WEBSITE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{{ website_name }}</title>
+<style>
+:root {
+    --bg: #ffffff;
+    --fg: #1f2328;
+    --muted: #59636e;
+    --accent: #b3471d;
+    --card: #f6f4f1;
+    --border: #e3ded7;
+}
+@media (prefers-color-scheme: dark) {
+    :root {
+        --bg: #0e1117;
+        --fg: #e6edf3;
+        --muted: #9198a1;
+        --accent: #f0883e;
+        --card: #161b22;
+        --border: #30363d;
+    }
+}
+* { box-sizing: border-box; }
+html { scroll-behavior: smooth; }
+body {
+    margin: 0;
+    background: var(--bg);
+    color: var(--fg);
+    font-family: Georgia, "Times New Roman", serif;
+    line-height: 1.6;
+}
+nav {
+    position: sticky;
+    top: 0;
+    display: flex;
+    flex-wrap: wrap;
+    align-items: center;
+    gap: 0.5rem 1.25rem;
+    padding: 0.75rem 1.5rem;
+    background: var(--card);
+    border-bottom: 1px solid var(--border);
+}
+nav .brand { font-weight: bold; font-size: 1.25rem; margin-right: auto; }
+a { color: var(--accent); text-decoration: none; }
+a:hover { text-decoration: underline; }
+main { max-width: 52rem; margin: 0 auto; padding: 1.5rem; }
+.contents ol { padding-left: 1.25rem; }
+article {
+    margin: 2rem 0;
+    padding: 1.5rem;
+    background: var(--card);
+    border: 1px solid var(--border);
+    border-radius: 0.75rem;
+    scroll-margin-top: 4.5rem;
+}
+article h2 { margin-top: 0; }
+article table { border-collapse: collapse; }
+article th, article td { border: 1px solid var(--border); padding: 0.25rem 0.5rem; }
+.back { font-size: 0.9rem; color: var(--muted); }
+@media (max-width: 600px) {
+    nav { padding: 0.75rem 1rem; }
+    main { padding: 1rem; }
+    article { padding: 1rem; }
+}
+</style>
+</head>
+<body>
+<nav>
+    <span class="brand">{{ website_name }}</span>
+    {% for recipe in recipes %}<a href="#{{ recipe.anchor }}">{{ recipe.title }}</a>
+    {% endfor %}
+</nav>
+<main id="top">
+    <section class="contents">
+        <h1>{{ website_name }}</h1>
+        <ol>
+        {% for recipe in recipes %}<li><a href="#{{ recipe.anchor }}">{{ recipe.title }}</a></li>
+        {% endfor %}
+        </ol>
+    </section>
+    {% for recipe in recipes %}
+    <article id="{{ recipe.anchor }}">
+        <h2>{{ recipe.title }}</h2>
+        {{ recipe.content_html | safe }}
+        <p class="back"><a href="#top">Back to top</a></p>
+    </article>
+    {% endfor %}
+</main>
+<script>
+// Scroll in-page instead of following the link, so anchors work inside an iframe
+document.querySelectorAll('a[href^="#"]').forEach(function (link) {
+    link.addEventListener("click", function (event) {
+        var target = document.getElementById(link.getAttribute("href").slice(1));
+        if (target) {
+            event.preventDefault();
+            target.scrollIntoView({ behavior: "smooth" });
+        }
+    });
+});
+</script>
+</body>
+</html>
+"""
+
+# Prefix of the inline data URL images are sent as in bulk mode
+JPEG_DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+# Stands in for the image data URL while a bulk-mode request line is serialized; the
+# base64 bytes are then written around it, so they never become a Python str
+IMAGE_URL_PLACEHOLDER = "__IMAGE_URL__"
+
+# Batch API statuses after which a job produces no more results
+BATCH_FINAL_STATUSES = ("completed", "expired", "cancelled", "failed")
+
+# Vision model that transcribes the recipe photos
+TRANSCRIPTION_MODEL = "gpt-4o-mini"
+# Part of every transcription cache key; bump it when TRANSCRIPTION_INSTRUCTIONS changes
+# so transcriptions made with the old prompt are no longer served
+TRANSCRIPTION_PROMPT_VERSION = 2
+
+# On-disk transcription cache: location, size cap (bytes), and entry lifetime (seconds). It
+# also keeps each run's result list, the o1-mini generated websites and uploaded image file IDs
+TRANSCRIPTION_CACHE_DIR = "/tmp/recipe_transcriptions"
+TRANSCRIPTION_CACHE_SIZE_LIMIT = 2 << 30
+TRANSCRIPTION_CACHE_EXPIRE = 30 * 24 * 3600
+
+# Maximum number of generated websites kept in the in-memory cache
+WEBSITE_CACHE_SIZE = 32
+
+# Number of trailing characters of the website code shown while it streams in
+WEBSITE_PREVIEW_CHARS = 2000
+# Minimum seconds between live preview updates while the website streams in
+WEBSITE_PREVIEW_INTERVAL = 0.1
+
+@st.cache_resource
+def _lru_store(name):
+    """
+    Return the process-wide LRU store called `name`.
+
+    st.cache_data cannot memoize functions that stream into a placeholder, so those
+    results are kept here; st.cache_resource shares each store across reruns and sessions.
+
+    Args:
+        name (str): The name of the store.
+
+    Returns:
+        tuple: An (OrderedDict, threading.Lock) pair.
+    """
+    return OrderedDict(), threading.Lock()
+
+def _lru_get(name, key):
+    """
+    Look up `key` in the LRU store called `name`, marking it as recently used.
+
+    Args:
+        name (str): The name of the store.
+        key (str): The cache key.
+
+    Returns:
+        The cached value, or None on a cache miss.
+    """
+    cache, lock = _lru_store(name)
+    with lock:
+        if key not in cache:
+            return None
+        cache.move_to_end(key)
+        return cache[key]
+
+def _lru_put(name, key, value, max_entries):
+    """
+    Store `value` in the LRU store called `name`, evicting the least recently used
+    entries beyond `max_entries`.
+
+    Args:
+        name (str): The name of the store.
+        key (str): The cache key.
+        value: The value to cache.
+        max_entries (int): The maximum number of entries to keep.
+    """
+    cache, lock = _lru_store(name)
+    with lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+def _image_hash(image_data):
+    """
+    Compute the cache key for an image from its content.
+
+    Args:
+        image_data (bytes): The binary data of the image.
+
+    Returns:
+        str: The hex BLAKE2b digest of the image bytes.
+    """
+    return hashlib.blake2b(image_data, digest_size=16).hexdigest()
+
+@st.cache_resource
+def _transcription_cache():
+    """
+    Return the SQLite-backed transcription cache. It lives on disk, so transcriptions
+    survive process restarts and are shared by every worker on the same machine.
+
+    Returns:
+        diskcache.Cache: The transcription cache.
+    """
+    import diskcache
+
+    return diskcache.Cache(TRANSCRIPTION_CACHE_DIR, size_limit=TRANSCRIPTION_CACHE_SIZE_LIMIT)
+
+def _transcription_cache_key(image_hash):
+    """
+    Build the cache key of an image's transcription. The model and prompt version are
+    part of it, so changing either never serves a transcription made by the other.
+
+    Args:
+        image_hash (str): The content hash of the image.
+
+    Returns:
+        str: The cache key.
+    """
+    return f"{TRANSCRIPTION_MODEL}:v{TRANSCRIPTION_PROMPT_VERSION}:{image_hash}"
+
+def _get_cached_transcription(image_hash):
+    """
+    Look up a previous transcription of the same image bytes.
+
+    Args:
+        image_hash (str): The content hash of the image.
+
+    Returns:
+        str or None: The cached transcription, or None on a cache miss.
+    """
+    return _transcription_cache().get(_transcription_cache_key(image_hash))
+
+def _cache_transcription(image_hash, transcribed_text):
+    """
+    Store a transcription for TRANSCRIPTION_CACHE_EXPIRE seconds. Empty transcriptions
+    are not stored, so the image is sent again next time instead.
+
+    Args:
+        image_hash (str): The content hash of the image.
+        transcribed_text (str): The transcription to cache.
+    """
+    if not transcribed_text:
+        return
+    _transcription_cache().set(_transcription_cache_key(image_hash), transcribed_text, expire=TRANSCRIPTION_CACHE_EXPIRE)
+
+def _save_results(results):
+    """
+    Store a run's transcriptions in the transcription cache so a reloaded tab can restore them.
+
+    Args:
+        results (list of dict): Each dict contains 'Image Name' and 'Transcribed Text'.
+
+    Returns:
+        str: The key to restore the results with, kept in the page URL.
+    """
+    results_key = hashlib.blake2b(json.dumps(results).encode('utf-8'), digest_size=16).hexdigest()
+    _transcription_cache().set(f"results:{results_key}", results, expire=TRANSCRIPTION_CACHE_EXPIRE)
+    return results_key
+
+def _load_results(results_key):
+    """
+    Look up transcriptions stored by _save_results.
+
+    Args:
+        results_key (str): The key returned by _save_results.
+
+    Returns:
+        list of dict: The stored transcriptions, or an empty list if they have expired.
+    """
+    return _transcription_cache().get(f"results:{results_key}", [])
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def downscale_image(image_data):
+    """
+    Shrink an uploaded photo to fit within MAX_IMAGE_EDGE and re-encode it as JPEG.
+
+    Args:
+        image_data (bytes): The binary data of the uploaded image.
+
+    Returns:
+        bytes: The JPEG-encoded image, or `image_data` unchanged if it cannot be decoded.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        image = Image.open(io.BytesIO(image_data))
+        # For JPEGs, let the decoder scale down by a power of two while decoding (never below
+        # MAX_IMAGE_EDGE), so a 12 MP photo is never fully decoded just to be shrunk
+        image.draft("RGB", (MAX_IMAGE_EDGE, MAX_IMAGE_EDGE))
+        # Apply the EXIF rotation before it is dropped by re-encoding
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, "JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True)
+        return buffer.getvalue()
+    except (OSError, Image.DecompressionBombError):
+        return image_data
+
+def read_uploads(uploaded_files):
+    """
+    Read and downscale all uploads in parallel, preserving upload order. Uploads over
+    MAX_UPLOAD_BYTES are reported and skipped.
+
+    Args:
+        uploaded_files (list of UploadedFile): The files from st.file_uploader.
+
+    Returns:
+        list of dict: Each dict contains 'image_name' and 'image_data'.
+    """
+    accepted = []
+    for uploaded_file in uploaded_files:
+        if uploaded_file.size > MAX_UPLOAD_BYTES:
+            st.error(f"❌ {uploaded_file.name} is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB and was skipped.")
+        else:
+            accepted.append(uploaded_file)
+
+    # Worker threads need the script context to use st.cache_data
+    ctx = get_script_run_ctx()
+
+    def read(uploaded_file):
+        return {
+            "image_name": uploaded_file.name,
+            "image_data": downscale_image(uploaded_file.getvalue())
+        }
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(IMAGE_PREP_WORKERS, len(accepted))),
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+    ) as executor:
+        return list(executor.map(read, accepted))
+
+@st.cache_resource
+def _llm_slots():
+    """
+    Return the process-wide semaphore limiting in-flight transcription requests.
+
+    Each run has its own event loop, so an asyncio.Semaphore can't be shared across
+    sessions; a threading semaphore polled without blocking can.
+
+    Returns:
+        threading.BoundedSemaphore: LLM_INFLIGHT_LIMIT request slots.
+    """
+    return threading.BoundedSemaphore(LLM_INFLIGHT_LIMIT)
+
+@st.cache_resource
+def _request_bucket():
+    """
+    Return the process-wide token bucket pacing transcription requests to LLM_REQUESTS_PER_MINUTE.
+
+    Returns:
+        dict: The available 'tokens', the time they were last 'updated', and the 'lock' guarding both.
+    """
+    return {"tokens": float(LLM_REQUESTS_PER_MINUTE), "updated": time.monotonic(), "lock": threading.Lock()}
+
+def _take_request_token():
+    """
+    Take one request token from the bucket if one is available.
+
+    Returns:
+        float: 0 if a token was taken, otherwise the seconds until the next one is available.
+    """
+    bucket = _request_bucket()
+    rate = LLM_REQUESTS_PER_MINUTE / 60
+    with bucket["lock"]:
+        now = time.monotonic()
+        bucket["tokens"] = min(LLM_REQUESTS_PER_MINUTE, bucket["tokens"] + (now - bucket["updated"]) * rate)
+        bucket["updated"] = now
+        if bucket["tokens"] >= 1:
+            bucket["tokens"] -= 1
+            return 0
+        return (1 - bucket["tokens"]) / rate
+
+async def _create_response(aclient, **kwargs):
+    """
+    Send a Responses API request once the rate limit allows it and a process-wide request
+    slot is free, logging its duration.
+
+    Args:
+        aclient (AsyncOpenAI): The async OpenAI client to send the request with.
+        **kwargs: Arguments for responses.create.
+
+    Returns:
+        Response: The API response.
+    """
+    slots = _llm_slots()
+    queued = time.perf_counter()
+    while (wait := _take_request_token()) > 0:
+        await asyncio.sleep(wait)
+    # Poll rather than block in a worker thread, so a cancelled run can't leak a slot
+    while not slots.acquire(blocking=False):
+        await asyncio.sleep(LLM_SLOT_POLL_INTERVAL)
+    started = time.perf_counter()
+    try:
+        return await aclient.responses.create(**kwargs)
+    finally:
+        slots.release()
+        logger.info(
+            "transcription request: queued %.2fs, took %.2fs",
+            started - queued, time.perf_counter() - started,
+        )
+
+def _log_prompt_cache_usage(response):
+    """
+    Log how many input tokens of a Responses API call were served from OpenAI's prompt cache.
+
+    Args:
+        response (Response): The API response.
+    """
+    usage = response.usage
+    if usage is not None and usage.input_tokens_details is not None:
+        logger.info(
+            "prompt cache: %d of %d input tokens cached",
+            usage.input_tokens_details.cached_tokens, usage.input_tokens,
+        )
 
-# Initialize OpenAI client
-openai_api_key = st.secrets["OPENAI_API_KEY"]
-client = OpenAI(api_key=openai_api_key)
+def _transcription_prompt(image_name):
+    """
+    Build the per-image text sent after TRANSCRIPTION_INSTRUCTIONS.
+
+    Args:
+        image_name (str): The name of the image file.
+
+    Returns:
+        str: The prompt text.
+    """
+    return f"Image Name: {image_name}"
+
+def _transcription_request(image_url, image_name):
+    """
+    Build the chat completion request body the Batch API sends for one image. The image
+    is inlined as base64 because the whole JSONL file is uploaded in a single request.
+
+    Args:
+        image_url (str): The image URL to send, or IMAGE_URL_PLACEHOLDER.
+        image_name (str): The name of the image file.
+
+    Returns:
+        dict: The keyword arguments for `chat.completions.create`.
+    """
+    return {
+        "model": TRANSCRIPTION_MODEL,
+        "messages": [
+            {"role": "system", "content": TRANSCRIPTION_INSTRUCTIONS},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": _transcription_prompt(image_name)},
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": image_url},
+                    },
+                ],
+            }
+        ],
+        "max_completion_tokens": 16000,  # Adjust as needed, up to the model's limit
+    }
+
+def _forget_uploaded_image(image_hash):
+    """
+    Drop the recorded upload of an image, e.g. after OpenAI rejected its file ID.
+
+    Args:
+        image_hash (str): The content hash of the image.
+    """
+    _transcription_cache().delete(f"file:{image_hash}")
+
+async def _upload_image(aclient, image_hash, image_data):
+    """
+    Upload an image to the OpenAI Files API, reusing an earlier upload of the same bytes.
+    File IDs are kept in the on-disk cache until shortly before OpenAI deletes the upload,
+    so restarted servers and other workers reuse them too.
+
+    Args:
+        aclient (AsyncOpenAI): The async OpenAI client to upload with.
+        image_hash (str): The content hash of the image.
+        image_data (bytes): The binary data of the image.
 
-def transcribe_image(image_data, image_name):
+    Returns:
+        str: The ID of the uploaded file.
+    """
+    file_id = _transcription_cache().get(f"file:{image_hash}")
+    if file_id is None:
+        # Uploads are re-encoded as JPEG by downscale_image, whatever their original extension
+        uploaded = await aclient.files.create(
+            file=(f"{image_hash}.jpg", image_data, "image/jpeg"),
+            purpose="vision",
+            expires_after={"anchor": "created_at", "seconds": UPLOADED_IMAGE_TTL},
+        )
+        file_id = uploaded.id
+        # Stop reusing the upload shortly before OpenAI deletes it
+        lifetime = uploaded.created_at + UPLOADED_IMAGE_TTL - UPLOADED_IMAGE_REUSE_MARGIN - time.time()
+        _transcription_cache().set(f"file:{image_hash}", file_id, expire=lifetime)
+    return file_id
+
+async def transcribe_image(aclient, image_data, image_name):
     """
     Transcribe a single image of a handwritten recipe into markdown format using OpenAI's GPT-4o-mini.
 
     Args:
+        aclient (AsyncOpenAI): The async OpenAI client to send the request with.
         image_data (bytes): The binary data of the image.
         image_name (str): The name of the image file.
 
     Returns:
         dict: A dictionary containing 'Image Name' and 'Transcribed Text'.
     """
+    # Identical image bytes always produce the same transcription, so skip the API call on a hit
+    image_hash = _image_hash(image_data)
+    cached_text = _get_cached_transcription(image_hash)
+    if cached_text is not None:
+        return {"Image Name": image_name, "Transcribed Text": cached_text}
+
     try:
-        # Encode image to base64
-        base64_image = base64.b64encode(image_data).decode('utf-8')
-        
+        # Send the image once via the Files API and refer to it by ID instead of inlining base64
+        file_id = await _upload_image(aclient, image_hash, image_data)
+
         # Prepare the API request
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        response = await _create_response(
+            aclient,
+            model=TRANSCRIPTION_MODEL,
+            instructions=TRANSCRIPTION_INSTRUCTIONS,
+            prompt_cache_key=TRANSCRIPTION_CACHE_KEY,
+            input=[
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": f"Transcribe the following handwritten recipe into markdown format without any commentary. Image Name: {image_name}."},
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"},
-                        },
+                        {"type": "input_text", "text": _transcription_prompt(image_name)},
+                        {"type": "input_image", "file_id": file_id, "detail": "auto"},
                     ],
                 }
             ],
-            max_completion_tokens=16000  # Adjust as needed, up to the model's limit 
+            max_output_tokens=16000  # Adjust as needed, up to the model's limit 
         )
         
+        _log_prompt_cache_usage(response)
+
         # Extract the transcribed text
-        transcribed_text = response.choices[0].message.content.strip()
+        transcribed_text = response.output_text.strip()
+        _cache_transcription(image_hash, transcribed_text)
         return {"Image Name": image_name, "Transcribed Text": transcribed_text}
     
     except Exception as e:
+        from openai import BadRequestError, NotFoundError
+
+        if isinstance(e, (BadRequestError, NotFoundError)):
+            # The uploaded file may have been deleted; upload it again next time
+            _forget_uploaded_image(image_hash)
         st.error(f"❌ Error transcribing {image_name}: {e}")
         return {"Image Name": image_name, "Transcribed Text": ""}
 
-def generate_single_page_website(recipes, website_name):
+async def _gather_bounded(coros, limit=MAX_CONCURRENT_TRANSCRIPTIONS):
     """
-    Generate a complete single-page HTML website with embedded CSS and JavaScript based on the transcribed recipes using OpenAI's o1-mini.
+    Run coroutines concurrently with at most `limit` of them in flight at once.
 
     Args:
-        recipes (list of dict): Each dict contains 'title' and 'content'.
-        website_name (str): The name of the website.
+        coros (list): The coroutines to run.
+        limit (int): The maximum number of coroutines awaited concurrently.
 
     Returns:
-        str: The complete HTML code for the website.
+        list: The results in the same order as `coros`; exceptions are returned in place of results.
     """
-    try:
-        # Prepare the refined prompt for code generation
-        prompt = f"""
-Create a complete, responsive single-page HTML website named "{website_name}". The website should display the following recipes in a user-friendly format with proper navigation.
+    semaphore = asyncio.Semaphore(limit)
 
-For each recipe, create a comprehensive blog post that includes:
+    async def run(coro):
+        async with semaphore:
+            return await coro
 
-- **An engaging introduction**: Hook the reader with a personal anecdote, the history of the recipe, or why it's special.
+    return await asyncio.gather(*(run(coro) for coro in coros), return_exceptions=True)
 
-- **A detailed ingredient list**: Clearly list all ingredients with measurements.
+def _parse_transcription_list(text, expected):
+    """
+    Parse the {"transcriptions": [...]} JSON object returned for a multi-image request.
 
-- **Step-by-step instructions**: Provide clear and concise cooking steps, using numbered lists.
+    Args:
+        text (str): The raw model response.
+        expected (int): The number of images sent in the request.
 
-- **Helpful tips and variations**: Offer cooking tips, substitution suggestions, and variations.
+    Returns:
+        list of str: One transcription per image, in request order.
+    """
+    transcriptions = json.loads(text).get("transcriptions")
+    if not isinstance(transcriptions, list) or len(transcriptions) != expected:
+        raise ValueError(f"expected a JSON list of {expected} transcriptions")
+
+    markdowns = []
+    for transcription in transcriptions:
+        # A null markdown means nothing was read; anything else that isn't a string is malformed
+        markdown = (transcription.get("markdown") or "") if isinstance(transcription, dict) else None
+        if not isinstance(markdown, str):
+            raise ValueError(f"expected a markdown string, got {transcription!r:.100}")
+        markdowns.append(markdown.strip())
+    return markdowns
+
+async def _transcribe_individually(aclient, images):
+    """
+    Transcribe each image of a failed group with its own request.
 
-- **Nutritional information**: Include approximate nutritional values if possible.
+    Args:
+        aclient (AsyncOpenAI): The async OpenAI client to send the requests with.
+        images (list of dict): Each dict contains 'image_name' and 'image_data'.
 
-- **A captivating conclusion**: Summarize the recipe experience or encourage readers to try it out.
+    Returns:
+        list of dict: One {'Image Name', 'Transcribed Text'} dict per image, in order.
+    """
+    return list(await asyncio.gather(*(
+        transcribe_image(aclient, img['image_data'], img['image_name']) for img in images
+    )))
 
-Ensure that the blog posts are written in a friendly, conversational tone, aiming for about 800-1000 words each. Use high-quality, descriptive language to make the recipes come alive.
+async def transcribe_image_group(aclient, images):
+    """
+    Transcribe several images with a single request, so the fixed prompt and the
+    per-request overhead are paid once for the whole group. If the reply can't be
+    parsed (e.g. it was cut off at max_output_tokens) or the request keeps timing out,
+    each image is retried on its own.
 
-Include embedded CSS styles that support both light and dark modes based on the user's system preferences, ensuring high contrast between text and background for readability. Use appropriate HTML tags to format headings, paragraphs, lists, and other elements to ensure the recipes are well-presented and easy to read.
+    Args:
+        aclient (AsyncOpenAI): The async OpenAI client to send the request with.
+        images (list of dict): Each dict contains 'image_name' and 'image_data'.
 
-Recipes:
-{json.dumps(recipes, indent=2)}
+    Returns:
+        list of dict: One {'Image Name', 'Transcribed Text'} dict per image, in order.
+    """
+    import httpx
 
-**Requirements:**
+    if len(images) == 1:
+        return [await transcribe_image(aclient, images[0]['image_data'], images[0]['image_name'])]
 
-- **Navigation Bar**: A navigation bar with the website name and links to each recipe section.
+    image_hashes = [_image_hash(img['image_data']) for img in images]
+    try:
+        file_ids = await asyncio.gather(*(
+            _upload_image(aclient, image_hash, img['image_data'])
+            for image_hash, img in zip(image_hashes, images)
+        ))
+
+        content = [{
+            "type": "input_text",
+            "text": (
+                f'Return a JSON object {{"transcriptions": [{{"image_name": ..., "markdown": ...}}, ...]}} '
+                f"with {len(images)} entries, one per image, in the order the images are given."
+            ),
+        }]
+        for position, (img, file_id) in enumerate(zip(images, file_ids), 1):
+            # Numbered markers keep the model from losing its place between images
+            content.append({"type": "input_text", "text": f"=== IMAGE {position} === {_transcription_prompt(img['image_name'])}"})
+            content.append({"type": "input_image", "file_id": file_id, "detail": "auto"})
+
+        response = await _create_response(
+            aclient.with_options(
+                # A bare number would also stretch the connect timeout to the whole group budget
+                timeout=httpx.Timeout(
+                    TRANSCRIPTION_TIMEOUT + TRANSCRIPTION_TIMEOUT_PER_EXTRA_IMAGE * (len(images) - 1),
+                    connect=OPENAI_CONNECT_TIMEOUT,
+                ),
+                max_retries=TRANSCRIPTION_GROUP_MAX_RETRIES,
+            ),
+            model=TRANSCRIPTION_MODEL,
+            instructions=TRANSCRIPTION_INSTRUCTIONS,
+            prompt_cache_key=TRANSCRIPTION_CACHE_KEY,
+            input=[{"role": "user", "content": content}],
+            text={"format": {"type": "json_object"}},
+            max_output_tokens=16000  # Shared by every recipe in the group
+        )
+        _log_prompt_cache_usage(response)
 
-- **Main Section**: A main section listing all recipes with links that navigate to each recipe within the same page using anchor tags.
+    except Exception as e:
+        from openai import APIConnectionError, BadRequestError, InternalServerError, NotFoundError
+
+        if isinstance(e, (APIConnectionError, InternalServerError)):
+            # Still failing after the SDK's retries (timeouts included); smaller requests are
+            # likelier to get through, and each image then fails or succeeds on its own
+            logger.warning("falling back to single-image requests for %d images: %s", len(images), e)
+            return await _transcribe_individually(aclient, images)
+        if isinstance(e, (BadRequestError, NotFoundError)):
+            # An uploaded file may have been deleted; upload them again next time
+            for image_hash in image_hashes:
+                _forget_uploaded_image(image_hash)
+        for img in images:
+            st.error(f"❌ Error transcribing {img['image_name']}: {e}")
+        return [{"Image Name": img['image_name'], "Transcribed Text": ""} for img in images]
 
-- **Responsive Design**: Ensure the website is responsive for mobile and desktop devices.
+    try:
+        transcriptions = _parse_transcription_list(response.output_text, len(images))
+    except (ValueError, AttributeError) as e:
+        logger.warning("falling back to single-image requests for %d images: %s", len(images), e)
+        return await _transcribe_individually(aclient, images)
+
+    results = []
+    for image_hash, img, transcribed_text in zip(image_hashes, images, transcriptions):
+        _cache_transcription(image_hash, transcribed_text)
+        results.append({"Image Name": img['image_name'], "Transcribed Text": transcribed_text})
+    return results
+
+async def transcribe_images(images, progress=None):
+    """
+    Transcribe all uploaded images concurrently, preserving upload order. Cached images
+    are answered directly, repeated uploads of the same bytes are sent only once, and
+    the rest are sent in evenly sized groups of at most TRANSCRIPTION_GROUP_SIZE.
 
-- **Dark Mode Support**: Use CSS media queries to support light and dark modes, ensuring high contrast for readability.
+    Args:
+        images (list of dict): Each dict contains 'image_name' and 'image_data'.
+        progress (DeltaGenerator, optional): An st.progress bar advanced as groups finish.
 
-- **Embedded CSS and JavaScript**: Include all CSS and JavaScript within the HTML file (no external files).
+    Returns:
+        list of dict: One {'Image Name', 'Transcribed Text'} dict per image, in upload order.
+    """
+    results = [None] * len(images)
+    misses = []
+    first_upload = {}
+    duplicates = {}
+    for index, img in enumerate(images):
+        image_hash = _image_hash(img['image_data'])
+        if image_hash in first_upload:
+            # Same bytes uploaded again (e.g. a folder dragged in twice); reuse the first result
+            duplicates[index] = first_upload[image_hash]
+            continue
+        first_upload[image_hash] = index
+
+        cached_text = _get_cached_transcription(image_hash)
+        if cached_text is None:
+            misses.append(index)
+        else:
+            results[index] = {"Image Name": img['image_name'], "Transcribed Text": cached_text}
+
+    # Spread the misses evenly over the fewest groups of at most TRANSCRIPTION_GROUP_SIZE, so the
+    # concurrent requests finish together instead of one full group outlasting a nearly empty one
+    group_count = -(-len(misses) // TRANSCRIPTION_GROUP_SIZE)
+    groups = [
+        misses[len(misses) * group // group_count:len(misses) * (group + 1) // group_count]
+        for group in range(group_count)
+    ]
+    if groups:
+        # The async client is scoped to this event loop; asyncio.run() closes the loop when we return
+        done = len(images) - len(misses)
+
+        async def transcribe_group(aclient, group):
+            nonlocal done
+            try:
+                return await transcribe_image_group(aclient, [images[index] for index in group])
+            finally:
+                done += len(group)
+                if progress is not None:
+                    progress.progress(done / len(images), text=f"📝 Transcribed {done} of {len(images)} images")
+
+        async with _async_openai_client() as aclient:
+            outcomes = await _gather_bounded([transcribe_group(aclient, group) for group in groups])
+
+        for group, outcome in zip(groups, outcomes):
+            for position, index in enumerate(group):
+                if isinstance(outcome, BaseException):
+                    st.error(f"❌ Error transcribing {images[index]['image_name']}: {outcome}")
+                    results[index] = {"Image Name": images[index]['image_name'], "Transcribed Text": ""}
+                else:
+                    results[index] = outcome[position]
 
-- **Smooth Scrolling**: Implement smooth scrolling when navigating to different sections.
+    for index, first_index in duplicates.items():
+        results[index] = {"Image Name": images[index]['image_name'], "Transcribed Text": results[first_index]["Transcribed Text"]}
+    return results
 
-- **Iframe Compatibility**: Ensure that anchor links function correctly within an iframe without redirecting the main page.
+def submit_transcription_batch(images):
+    """
+    Submit the images without a cached transcription as one OpenAI Batch API job. Batch
+    requests cost 50% less and have their own rate limits, but may take up to 24 hours
+    to complete. Cached images are answered from the cache when the results are collected.
 
-- **Consistent Formatting**: Use clear and consistent formatting for all recipes and blog posts.
+    Args:
+        images (list of dict): Each dict contains 'image_name' and 'image_data'.
 
-- **No Explanations**: Do not include any explanations or additional text; only provide the complete HTML code.
+    Returns:
+        str or None: The ID of the created batch, or None if every image is already cached.
+    """
+    # Write each request line straight into one buffer, so only one encoded image is alive
+    # at a time instead of a list of lines plus their joined and encoded copies
+    jsonl = io.BytesIO()
+    image_hashes = [_image_hash(img['image_data']) for img in images]
+    # One request per distinct uncached image; repeated uploads of the same bytes share its result
+    misses = {}
+    for img, image_hash in zip(images, image_hashes):
+        if image_hash not in misses and _get_cached_transcription(image_hash) is None:
+            misses[image_hash] = img
+    if not misses:
+        return None
+
+    for image_hash, img in misses.items():
+        # The content hash is unique per line and lets the results be added to the transcription cache
+        line = json.dumps({
+            "custom_id": image_hash,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _transcription_request(IMAGE_URL_PLACEHOLDER, img['image_name']),
+        })
+        # json.dumps escapes non-ASCII by default, so the line is pure ASCII. The image name may
+        # contain the placeholder too, but only ever before the image URL, hence rpartition
+        head, _, tail = line.rpartition(IMAGE_URL_PLACEHOLDER)
+        jsonl.write(head.encode('ascii'))
+        jsonl.write(JPEG_DATA_URL_PREFIX)
+        # Base64 needs no JSON escaping, so the encoded bytes go straight into the buffer
+        jsonl.write(binascii.b2a_base64(img['image_data'], newline=False))
+        jsonl.write(tail.encode('ascii'))
+        jsonl.write(b"\n")
+    jsonl.seek(0)
+
+    client = get_openai_client()
+    batch_file = client.files.create(
+        file=("transcriptions.jsonl", jsonl),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    # The upload list lets every image get a row in the results, even one the job never answered
+    _transcription_cache().set(
+        f"batch:{batch.id}",
+        [(img['image_name'], image_hash) for img, image_hash in zip(images, image_hashes)],
+        expire=TRANSCRIPTION_CACHE_EXPIRE,
+    )
+    return batch.id
+
+def fetch_transcription_batch(batch_id):
+    """
+    Check a bulk transcription job once and, if it has ended, collect its results.
+    This never waits, so a pending job doesn't hold up the rest of the page.
 
-- **Valid HTML**: Ensure the HTML code is valid and well-formatted.
+    Args:
+        batch_id (str): The ID returned by `submit_transcription_batch`.
 
-"""
-        # Make the API call to o1-mini without system prompts
-        response = client.chat.completions.create(
-            model="o1-mini",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            max_completion_tokens=64000  # Adjust as needed, up to the model's limit 
-        )
+    Returns:
+        list of dict or None: One {'Image Name', 'Transcribed Text'} dict per submitted
+        image in upload order, or None if the job is still running.
+    """
+    client = get_openai_client()
+    batch = client.batches.retrieve(batch_id)
+    if batch.status not in BATCH_FINAL_STATUSES:
+        return None
+    if batch.status == "failed":
+        raise RuntimeError(f"bulk job {batch_id} failed: {batch.errors}")
+
+    manifest = _transcription_cache().get(f"batch:{batch_id}")
+    if manifest is None:
+        raise RuntimeError(f"the upload list of bulk job {batch_id} is no longer available")
+
+    # Successful requests land in the output file; failed or expired ones in the error file.
+    # An expired or cancelled job may have neither.
+    lines = []
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if file_id:
+            lines.extend(client.files.content(file_id).text.splitlines())
+
+    texts = {}
+    errors = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        image_hash = entry["custom_id"]
+        response = entry.get("response") or {}
+        if response.get("status_code") == 200:
+            message = response["body"]["choices"][0]["message"]
+            # A refusal succeeds with a null content; report it for that image only
+            content = (message.get("content") or "").strip()
+            if content:
+                texts[image_hash] = content
+                _cache_transcription(image_hash, content)
+            else:
+                errors[image_hash] = message.get("refusal") or "the model returned no text"
+        else:
+            errors[image_hash] = entry.get("error") or response.get("body", {}).get("error")
+
+    results = []
+    for image_name, image_hash in manifest:
+        # Images that were cached at submit time were left out of the job, and repeated
+        # uploads of the same bytes share one request
+        transcribed_text = texts.get(image_hash, _get_cached_transcription(image_hash))
+        if transcribed_text is None:
+            error = errors.get(image_hash, f"no result, the job ended as {batch.status}")
+            st.error(f"❌ Error transcribing {image_name}: {error}")
+            transcribed_text = ""
+        results.append({"Image Name": image_name, "Transcribed Text": transcribed_text})
+    return results
+
+def _extract_website_code(website_code):
+    """
+    Pull the HTML out of an o1-mini reply.
+
+    Args:
+        website_code (str): The raw model response.
+
+    Returns:
+        str: The code within triple backticks if present, otherwise the whole response.
+    """
+    code_match = HTML_FENCE_RE.search(website_code)
+    if code_match:
+        return code_match.group(1).strip()
+    # If no backticks, assume the entire response is code
+    return website_code
 
-        website_code = response.choices[0].message.content.strip()
+def _complete_website_prompt(prompt, placeholder):
+    """
+    Send the website-generation prompt to o1-mini, streaming the tail of the code into
+    `placeholder` as it arrives. Responses are cached per prompt, in memory and on disk
+    alongside the transcriptions, so a restarted server doesn't pay for them again.
 
-        # Extract code within triple backticks if present
-        code_match = re.search(r"```html\s*(.*?)\s*```", website_code, re.DOTALL | re.IGNORECASE)
-        if code_match:
-            code = code_match.group(1).strip()
-        else:
-            # If no backticks, assume the entire response is code
-            code = website_code
+    Args:
+        prompt (str): The prompt to send.
+        placeholder (DeltaGenerator): An st.empty() slot for the live preview.
+
+    Returns:
+        str: The raw model response.
+    """
+    import httpx
+
+    # The prompt embeds the website name and recipes, so its hash identifies the request
+    prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    cached_code = _lru_get("websites", prompt_hash)
+    if cached_code is None:
+        cached_code = _transcription_cache().get(f"website:{prompt_hash}")
+        if cached_code is not None:
+            _lru_put("websites", prompt_hash, cached_code, WEBSITE_CACHE_SIZE)
+    if cached_code is not None:
+        return cached_code
+
+    # Make the API call to o1-mini without system prompts
+    client = get_openai_client()
+    stream = client.with_options(
+        timeout=httpx.Timeout(WEBSITE_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+    ).chat.completions.create(
+        model="o1-mini",
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        max_completion_tokens=64000,  # Reasoning tokens count against this too, so keep headroom
+        stream=True
+    )
+
+    chunks = []
+    preview = ""
+    last_update = 0.0
+    finish_reason = None
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        finish_reason = chunk.choices[0].finish_reason or finish_reason
+        delta = chunk.choices[0].delta.content
+        if delta:
+            chunks.append(delta)
+            preview = (preview + delta)[-WEBSITE_PREVIEW_CHARS:]
+            # Each update is a websocket message and a frontend re-render, so throttle them
+            now = time.monotonic()
+            if now - last_update >= WEBSITE_PREVIEW_INTERVAL:
+                placeholder.code(preview, language="html")
+                last_update = now
+
+    website_code = "".join(chunks).strip()
+    # Regenerate resolves to the same prompt, so only cache a reply that ran to completion and
+    # holds a whole page; an empty, truncated or malformed one is left for the next attempt
+    if finish_reason == "stop" and DOCTYPE_RE.search(_extract_website_code(website_code)):
+        _lru_put("websites", prompt_hash, website_code, WEBSITE_CACHE_SIZE)
+        _transcription_cache().set(f"website:{prompt_hash}", website_code, expire=TRANSCRIPTION_CACHE_EXPIRE)
+    return website_code
+
+def generate_single_page_website(recipes, website_name):
+    """
+    Generate a complete single-page HTML website with embedded CSS and JavaScript based on the transcribed recipes using OpenAI's o1-mini.
+
+    Args:
+        recipes (list of dict): Each dict contains 'title' and 'content'.
+        website_name (str): The name of the website.
+
+    Returns:
+        str: The complete HTML code for the website.
+    """
+    try:
+        # Static instructions first and the per-request data last, so the shared prefix can be served from OpenAI's prompt cache
+        # Every space and newline is a prompt token, so send the recipes as compact JSON
+        compact_recipes = [
+            {
+                "title": recipe["title"].strip(),
+                "content": BLANK_LINES_RE.sub("\n\n", HORIZONTAL_WHITESPACE_RE.sub(" ", recipe["content"])).strip(),
+            }
+            for recipe in recipes
+        ]
+        prompt = f"""{WEBSITE_PROMPT}
+Website name: "{website_name}"
+
+Recipes:
+{json.dumps(compact_recipes, separators=(",", ":"), ensure_ascii=False)}
+"""
+        # Show the code as it streams in, then clear the preview once it is complete
+        placeholder = st.empty()
+        website_code = _complete_website_prompt(prompt, placeholder)
+        placeholder.empty()
+
+        code = _extract_website_code(website_code)
 
         # Validate that the code contains essential HTML structure
-        if not re.search(r"<!DOCTYPE html>", code, re.IGNORECASE):
+        if not DOCTYPE_RE.search(code):
             st.warning("⚠️ The generated website code might be incomplete or improperly formatted.")
 
         return code
@@ -142,6 +1300,177 @@ Recipes:
         st.error(f"❌ Error generating website: {e}")
         return ""
 
+@st.cache_resource
+def _website_template():
+    """
+    Compile WEBSITE_TEMPLATE once per process.
+
+    Returns:
+        jinja2.Template: The compiled page template.
+    """
+    import jinja2
+
+    return jinja2.Environment(autoescape=True).from_string(WEBSITE_TEMPLATE)
+
+def render_recipe_website(recipes, website_name):
+    """
+    Render the recipes into a single-page website locally, without calling a model.
+
+    Args:
+        recipes (list of dict): Each dict contains 'title' and 'content'.
+        website_name (str): The name of the website.
+
+    Returns:
+        str: The complete HTML code for the website.
+    """
+    import markdown
+
+    # The content is model output, and may come from a shared ?results= link, but the template
+    # marks it safe. Escape it so raw HTML renders as text, and drop link syntax, which would
+    # otherwise carry javascript: URLs; the transcription prompt never produces links anyway
+    md = markdown.Markdown(extensions=["fenced_code", "tables"])
+    for pattern in ("reference", "link", "image_link", "image_reference", "short_reference", "short_image_ref"):
+        md.inlinePatterns.deregister(pattern, strict=False)
+
+    rendered = []
+    for index, recipe in enumerate(recipes, 1):
+        rendered.append({
+            "title": recipe["title"],
+            "anchor": f"recipe-{index}",
+            "content_html": md.reset().convert(MARKDOWN_UNSAFE_RE.sub(lambda m: MARKDOWN_ESCAPES[m.group()], recipe["content"])),
+        })
+    return _website_template().render(website_name=website_name, recipes=rendered)
+
+def transcriptions_table(results):
+    """
+    Build the table st.dataframe shows the transcriptions in. Streamlit sends an Arrow
+    table to the browser as-is, whereas a list of dicts is first converted to pandas.
+
+    Args:
+        results (list of dict): Each dict contains 'Image Name' and 'Transcribed Text'.
+
+    Returns:
+        pyarrow.Table: One row per transcription.
+    """
+    import pyarrow
+
+    return pyarrow.Table.from_pylist(results)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def transcriptions_to_csv(results):
+    """
+    Serialize transcriptions to CSV. Cached so reruns that show the same results
+    reuse the download payload instead of rebuilding it.
+
+    Args:
+        results (list of dict): Each dict contains 'Image Name' and 'Transcribed Text'.
+
+    Returns:
+        bytes: The UTF-8 encoded CSV, including a header row.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Image Name", "Transcribed Text"])
+    writer.writerows((row["Image Name"], row["Transcribed Text"]) for row in results)
+    return buffer.getvalue().encode('utf-8')
+
+def prepare_recipes(results):
+    """
+    Split each transcription into the title and content the website generators expect.
+
+    Args:
+        results (list of dict): Each dict contains 'Image Name' and 'Transcribed Text'.
+
+    Returns:
+        list of dict: Each dict contains 'title' and 'content'.
+    """
+    recipes = []
+    for row in results:
+        transcription = row["Transcribed Text"]
+        # Extract title from markdown (assuming the first line is the title);
+        # partition stops at the first newline instead of splitting every line
+        first_line, _, rest = transcription.partition('\n')
+        if first_line.startswith('#'):
+            title = first_line.lstrip('#').strip() or "Untitled Recipe"
+            content = rest.strip()
+        else:
+            title = "Untitled Recipe"
+            content = transcription
+        recipes.append({
+            "title": title,
+            "content": content
+        })
+    return recipes
+
+def generate_and_show_website(results, website_name, ai_layout, regenerate=False):
+    """
+    Build the website from the transcriptions and show it with its downloads. If the
+    recipes, name and layout are unchanged since the last website, that website is
+    reused instead of being generated again.
+
+    Args:
+        results (list of dict): Each dict contains 'Image Name' and 'Transcribed Text'.
+        website_name (str): The name of the website.
+        ai_layout (bool): Whether o1-mini designs the layout instead of the local template.
+        regenerate (bool): Whether this was triggered by 'Regenerate Website'.
+
+    Returns:
+        bool: Whether a website was rendered.
+    """
+    # Provide option to download the CSV file
+    # on_click="ignore": downloading doesn't rerun the script, so the results stay on screen
+    st.download_button("📥 Download CSV File", transcriptions_to_csv(results), "transcriptions.csv", "text/csv", on_click="ignore")
+
+    # Prepare recipes for website generation
+    recipes = prepare_recipes(results)
+
+    # Debugging: Display the recipes being sent to the website generator
+    st.markdown("**Debugging Info:**")
+    st.write("Sending the following recipes to the website generator:")
+    st.json(recipes)
+
+    website_key = hashlib.blake2b(
+        json.dumps([recipes, website_name, ai_layout]).encode('utf-8'), digest_size=16
+    ).hexdigest()
+    action = "regenerate" if regenerate else "generate"
+
+    # Generate the website
+    with st.spinner("💻 Regenerating your website..." if regenerate else "💻 Generating your website..."):
+        # An AI-written site that failed the DOCTYPE check is made again rather than kept
+        reused = (
+            website_key == st.session_state.website_key
+            and bool(st.session_state.website_code)
+            and (not ai_layout or bool(DOCTYPE_RE.search(st.session_state.website_code)))
+        )
+        if reused:
+            website_code = st.session_state.website_code
+        elif ai_layout:
+            website_code = generate_single_page_website(recipes, website_name)
+        else:
+            website_code = render_recipe_website(recipes, website_name)
+        if not website_code:
+            st.error(f"❌ Failed to {action} website code.")
+            return False
+
+        st.session_state.website_code = website_code
+        st.session_state.website_key = website_key
+        if reused:
+            st.info("ℹ️ The recipes, name and layout haven't changed, so your current website was kept.")
+        else:
+            st.success(f"🎉 Website {action}d successfully!")
+
+        # Render the website directly within the app using components.html
+        st.markdown("## 🌐 Your Generated Website")
+        components.html(
+            website_code,
+            height=1500,  # Adjust height as needed
+            scrolling=True
+        )
+
+        # Provide option to download the website code
+        st.download_button("📥 Download Website Code", website_code.encode('utf-8'), f"{website_name.replace(' ', '_')}.html", "text/html", on_click="ignore")
+    return True
+
 def main():
     st.set_page_config(page_title="📸 Handwritten Recipe Transcriber", layout="wide")
     st.title("📸 Handwritten Recipe Transcriber")
@@ -149,119 +1478,77 @@ def main():
 
     # Initialize session state variables
     if 'transcriptions' not in st.session_state:
-        st.session_state.transcriptions = []
+        # Restored from disk when the URL carries the key of a previous run, so a reload doesn't lose them
+        results_key = st.query_params.get("results")
+        st.session_state.transcriptions = _load_results(results_key) if results_key else []
     if 'website_code' not in st.session_state:
         st.session_state.website_code = ""
-
-    # Detect if dark mode is being used
-    theme = st.get_option("theme.base")
-    if theme == "dark":
-        text_color = "#FFFFFF"
-        bg_color = "#0e1117"
-    else:
-        text_color = "#000000"
-        bg_color = "#FFFFFF"
-
-    # Apply dynamic CSS based on the theme
-    st.markdown(f"""
-    <style>
-    .main {{
-        background-color: {bg_color};
-        color: {text_color};
-    }}
-    </style>
-    """, unsafe_allow_html=True)
+    if 'website_key' not in st.session_state:
+        # Identifies the recipes, name and layout website_code was built from
+        st.session_state.website_key = None
+    if 'bulk_job' not in st.session_state:
+        # Also kept in the URL so a closed tab can resume the job from a bookmarked link
+        st.session_state.bulk_job = st.query_params.get("bulk_job")
 
     # Ask for website name
     website_name = st.text_input("🌐 Enter a name for your website:", "My Recipe Book")
 
     uploaded_files = st.file_uploader("📂 Choose image files", accept_multiple_files=True, type=["png", "jpg", "jpeg"])
 
+    ai_layout = st.checkbox("🤖 AI-designed layout (slower)", help="Have o1-mini write the website, with a full blog post per recipe. Without this, the site is built instantly from the transcriptions.")
+
+    bulk_mode = st.checkbox("🐢 Bulk mode (cheaper, ~up to 24h)", help="Transcribe through the OpenAI Batch API at half the cost. Results may take up to 24 hours.")
+
     # "Submit" Button for Processing Images
     submit_button = st.button("Submit")
+    # Set once this run has shown the website, so it isn't sent to the browser twice
+    website_rendered = False
+
+    if submit_button and bulk_mode and uploaded_files:
+        images = read_uploads(uploaded_files)
 
-    if submit_button:
+        if not images:
+            st.warning("⚠️ Every upload was skipped, so there is nothing to transcribe.")
+        else:
+            with st.spinner("📤 Submitting bulk transcription job..."):
+                try:
+                    batch_id = submit_transcription_batch(images)
+                except Exception as e:
+                    st.error(f"❌ Error submitting bulk job: {e}")
+                else:
+                    if batch_id is not None:
+                        st.session_state.bulk_job = batch_id
+                        st.query_params["bulk_job"] = batch_id
+                    else:
+                        # Every image is cached, so this makes no API calls
+                        results = asyncio.run(transcribe_images(images))
+                        st.session_state.transcriptions = results
+                        st.query_params["results"] = _save_results(results)
+                        st.markdown("### 📄 Transcribed Recipes")
+                        st.dataframe(transcriptions_table(results))
+                        st.success("🎉 All images were already transcribed! Click 'Regenerate Website' to build your site.")
+
+    elif submit_button:
         if uploaded_files and website_name:
-            images = []
-            for uploaded_file in uploaded_files:
-                images.append({
-                    "image_name": uploaded_file.name,
-                    "image_data": uploaded_file.read()
-                })
+            images = read_uploads(uploaded_files)
 
-            st.markdown("### 📄 Transcribed Recipes")
-            results = []
-
-            with st.spinner("📝 Transcribing uploaded images..."):
-                # Use ThreadPoolExecutor to parallelize transcription
-                with ThreadPoolExecutor() as executor:
-                    # Submit all transcription tasks
-                    future_to_image = {executor.submit(transcribe_image, img['image_data'], img['image_name']): img for img in images}
-                    for future in as_completed(future_to_image):
-                        res = future.result()
-                        results.append(res)
-
-            # Update session state with transcriptions
-            st.session_state.transcriptions = results
+            if not images:
+                st.warning("⚠️ Every upload was skipped, so there is nothing to transcribe.")
+            else:
+                st.markdown("### 📄 Transcribed Recipes")
 
-            # Create DataFrame from results
-            df = pd.DataFrame(results)
-            st.dataframe(df)
-
-            # Debugging: Display the list of recipes being passed
-            st.markdown("**Debugging Info:**")
-            st.write("Preparing the following recipes for website generation:")
-            st.json(df.to_dict(orient='records'))
-
-            # Provide option to download the CSV file
-            csv = df.to_csv(index=False)
-            b64_csv = base64.b64encode(csv.encode()).decode()  # B64 encode
-            href_csv = f'<a href="data:file/csv;base64,{b64_csv}" download="transcriptions.csv">📥 Download CSV File</a>'
-            st.markdown(href_csv, unsafe_allow_html=True)
-
-            # Prepare recipes for website generation
-            recipes = []
-            for index, row in df.iterrows():
-                transcription = row["Transcribed Text"]
-                # Extract title from markdown (assuming the first line is the title)
-                lines = transcription.split('\n')
-                if lines and lines[0].startswith('#'):
-                    title = lines[0].replace('#', '').strip()
-                    content = '\n'.join(lines[1:]).strip()
-                else:
-                    title = "Untitled Recipe"
-                    content = transcription
-                recipes.append({
-                    "title": title,
-                    "content": content
-                })
-
-            # Debugging: Display the recipes being sent to the website generator
-            st.markdown("**Debugging Info:**")
-            st.write("Sending the following recipes to the website generator:")
-            st.json(recipes)
-
-            # Generate the website
-            with st.spinner("💻 Generating your website..."):
-                website_code = generate_single_page_website(recipes, website_name)
-                if website_code:
-                    st.session_state.website_code = website_code
-                    st.success("🎉 Website generated successfully!")
-
-                    # Render the website directly within the app using components.html
-                    st.markdown("## 🌐 Your Generated Website")
-                    components.html(
-                        website_code,
-                        height=1500,  # Adjust height as needed
-                        scrolling=True
-                    )
-                    
-                    # Provide option to download the website code
-                    b64_code = base64.b64encode(website_code.encode()).decode()
-                    href = f'<a href="data:text/html;base64,{b64_code}" download="{website_name.replace(" ", "_")}.html">📥 Download Website Code</a>'
-                    st.markdown(href, unsafe_allow_html=True)
-                else:
-                    st.error("❌ Failed to generate website code.")
+                progress = st.progress(0.0, text="📝 Transcribing uploaded images...")
+                # Dispatch all transcription requests concurrently on a single event loop
+                results = asyncio.run(transcribe_images(images, progress))
+                progress.empty()
+
+                # Update session state with transcriptions
+                st.session_state.transcriptions = results
+                st.query_params["results"] = _save_results(results)
+
+                st.dataframe(transcriptions_table(results))
+
+                website_rendered = generate_and_show_website(results, website_name, ai_layout)
 
         elif uploaded_files and not website_name:
             st.warning("⚠️ Please enter a name for your website.")
@@ -269,69 +1556,43 @@ def main():
         else:
             st.warning("⚠️ Please upload images of handwritten recipes and enter a website name.")
 
+    # Resume the pending bulk transcription job, if any
+    if st.session_state.bulk_job:
+        batch_id = st.session_state.bulk_job
+        results = None
+        # One status check per rerun; the button below (or any other interaction) checks again
+        try:
+            results = fetch_transcription_batch(batch_id)
+        except Exception as e:
+            st.error(f"❌ Bulk transcription failed: {e}")
+            st.session_state.bulk_job = None
+            st.query_params.pop("bulk_job", None)
+
+        if results is not None:
+            st.session_state.transcriptions = results
+            st.query_params["results"] = _save_results(results)
+            st.session_state.bulk_job = None
+            st.query_params.pop("bulk_job", None)
+            st.markdown("### 📄 Transcribed Recipes")
+            st.dataframe(transcriptions_table(results))
+            if any(row["Transcribed Text"] for row in results):
+                st.success("🎉 Bulk transcription finished! Click 'Regenerate Website' to build your site.")
+            else:
+                st.warning("⚠️ The bulk job ended without transcribing any images. Please submit them again.")
+        elif st.session_state.bulk_job:
+            st.info(f"⏳ Bulk job {batch_id} is still running. You can close this tab and reopen this page's URL later.")
+            st.button("🔍 Check bulk job status")
+
     # "Regenerate Website" Button
     regenerate_button = st.button("🔄 Regenerate Website")
 
     if regenerate_button:
         if st.session_state.transcriptions and website_name:
             st.markdown("### 📄 Transcribed Recipes")
-            df = pd.DataFrame(st.session_state.transcriptions)
-            st.dataframe(df)
-
-            # Debugging: Display the list of recipes being passed
-            st.markdown("**Debugging Info:**")
-            st.write("Preparing the following recipes for website regeneration:")
-            st.json(df.to_dict(orient='records'))
-
-            # Provide option to download the CSV file
-            csv = df.to_csv(index=False)
-            b64_csv = base64.b64encode(csv.encode()).decode()  # B64 encode
-            href_csv = f'<a href="data:file/csv;base64,{b64_csv}" download="transcriptions.csv">📥 Download CSV File</a>'
-            st.markdown(href_csv, unsafe_allow_html=True)
-
-            # Prepare recipes for website generation
-            recipes = []
-            for index, row in df.iterrows():
-                transcription = row["Transcribed Text"]
-                # Extract title from markdown (assuming the first line is the title)
-                lines = transcription.split('\n')
-                if lines and lines[0].startswith('#'):
-                    title = lines[0].replace('#', '').strip()
-                    content = '\n'.join(lines[1:]).strip()
-                else:
-                    title = "Untitled Recipe"
-                    content = transcription
-                recipes.append({
-                    "title": title,
-                    "content": content
-                })
-
-            # Debugging: Display the recipes being sent to the website generator
-            st.markdown("**Debugging Info:**")
-            st.write("Sending the following recipes to the website generator:")
-            st.json(recipes)
-
-            # Generate the website
-            with st.spinner("💻 Regenerating your website..."):
-                website_code = generate_single_page_website(recipes, website_name)
-                if website_code:
-                    st.session_state.website_code = website_code
-                    st.success("🎉 Website regenerated successfully!")
-
-                    # Render the website directly within the app using components.html
-                    st.markdown("## 🌐 Your Generated Website")
-                    components.html(
-                        website_code,
-                        height=1500,  # Adjust height as needed
-                        scrolling=True
-                    )
-                    
-                    # Provide option to download the website code
-                    b64_code = base64.b64encode(website_code.encode()).decode()
-                    href = f'<a href="data:text/html;base64,{b64_code}" download="{website_name.replace(" ", "_")}.html">📥 Download Website Code</a>'
-                    st.markdown(href, unsafe_allow_html=True)
-                else:
-                    st.error("❌ Failed to regenerate website code.")
+            results = st.session_state.transcriptions
+            st.dataframe(transcriptions_table(results))
+
+            generate_and_show_website(results, website_name, ai_layout, regenerate=True)
 
         elif not st.session_state.transcriptions:
             st.warning("⚠️ No transcriptions available. Please submit images first.")
@@ -339,7 +1600,7 @@ def main():
         elif not website_name:
             st.warning("⚠️ Please enter a name for your website.")
 
-    else:
+    elif not website_rendered:
         if st.session_state.website_code:
             st.markdown("## 🌐 Your Generated Website")
             components.html(